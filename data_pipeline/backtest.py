@@ -1,91 +1,108 @@
 # data_pipeline/backtest.py
 
+import numpy as np
 import pandas as pd
-from indicators import calculate_indicators
+from indicators import Bars
 
-def run_backtest(stock_data: pd.DataFrame, ticker: str):
+# Default number of trading days each position is held
+HOLD = 5
+
+def run_backtest(bars: Bars, ticker: str, rsi_threshold: float = 30, hold_days: int = HOLD):
     """
     Runs a backtest on historical stock data based on a defined trading strategy.
 
     Strategy:
-    - Buy Signal: RSI < 30 and 20-DMA crosses above 50-DMA.
+    - Buy Signal: RSI < rsi_threshold (default 30) and 20-DMA crosses above 50-DMA.
     - Action: Buy at the next day's open price.
-    - Exit: Sell 5 trading days later at the open price.
+    - Exit: Sell hold_days (default HOLD = 5) trading days later at the open price.
+
+    The indicators are computed once by the caller, so the same Bars can be reused
+    across sweeps over the strategy parameters.
 
     Args:
-        stock_data (pd.DataFrame): DataFrame with historical stock data.
+        bars (Bars): Indicator arrays as returned by make_bars.
         ticker (str): The stock ticker symbol.
+        rsi_threshold (float): RSI level below which the stock counts as oversold.
+        hold_days (int): Number of trading days to hold each position.
 
     Returns:
         dict: A dictionary containing backtest summary statistics and the trade log.
+              The raw 'wins' count and 'sum_return' let callers combine several
+              backtests without re-scanning their trade logs.
               Returns None if the backtest cannot be run.
     """
-    if stock_data is None or stock_data.empty:
+    if bars is None:
         print(f"No data provided for {ticker}, skipping backtest.")
         return None
 
-    # Step 1: Calculate technical indicators
-    data = calculate_indicators(stock_data.copy())
-    data = data.dropna()
-
-    if len(data) < 7: # Need at least 1 day for signal, 1 for buy, 5 for hold
+    if len(bars) < hold_days + 2: # Need at least 1 day for signal, 1 for buy, hold_days for hold
         print(f"Not enough data for {ticker} to run a backtest after indicator calculation.")
         return None
 
-    trades = []
-    
-    # Step 2: Loop through data to find trading signals
-    # We loop up to the 6th to last day to ensure there's a sell date 5 days after buy
-    for i in range(1, len(data) - 6):
-        # Yesterday's and Today's data slices
-        yesterday = data.iloc[i-1]
-        today = data.iloc[i]
-
-        # Signal Conditions
-        rsi_signal = today['RSI'] < 30
-        crossover_signal = (today['SMA_20'] > today['SMA_50']) and (yesterday['SMA_20'] <= yesterday['SMA_50'])
-
-        if rsi_signal and crossover_signal:
-            # Signal triggered, plan to buy next day
-            buy_date = data.index[i+1]
-            buy_price = data['Open'].iloc[i+1]
-            
-            # Plan to sell 5 days after buying
-            sell_date = data.index[i+6]
-            sell_price = data['Open'].iloc[i+6]
-            
-            # Calculate return
-            pct_return = ((sell_price - buy_price) / buy_price) * 100
-            
-            # Log the trade
-            trades.append({
-                'Stock': ticker,
-                'Buy Date': buy_date.strftime('%Y-%m-%d'),
-                'Buy Price': buy_price,
-                'Sell Date': sell_date.strftime('%Y-%m-%d'),
-                'Sell Price': sell_price,
-                'Return (%)': pct_return,
-                'Status': 'Win' if pct_return > 0 else 'Loss'
-            })
-
-    if not trades:
+    # Step 1: Find trading signals with vectorized comparisons over the indicator arrays
+    rsi = bars.rsi
+    sma20 = bars.sma20
+    sma50 = bars.sma50
+    open_ = bars.open
+    idx = bars.index
+
+    # Only signal days followed by a buy day and a sell day hold_days later can trade
+    m = len(bars) - hold_days - 2
+
+    # Aligned slices: position k is "today" = day k+1, "yesterday" = day k,
+    # the buy at day k+2 and the sell at day k+2+hold_days
+    today = slice(1, m + 1)
+    yesterday = slice(0, m)
+    buy_open = open_[2:m + 2]
+    sell_open = open_[hold_days + 2:]
+
+    crossover_signal = (sma20[today] > sma50[today]) & (sma20[yesterday] <= sma50[yesterday])
+    rsi_signal = rsi[today] < rsi_threshold
+    s = np.flatnonzero(crossover_signal & rsi_signal)
+
+    if s.size == 0:
         print(f"No trades were executed for {ticker} during the backtest period.")
         return {
             'total_trades': 0,
+            'wins': 0,
+            'sum_return': 0.0,
             'win_ratio': 0,
             'avg_return': 0,
             'trade_log': pd.DataFrame()
         }
 
-    # Step 3: Analyze results
-    trade_log_df = pd.DataFrame(trades)
-    total_trades = len(trade_log_df)
-    wins = len(trade_log_df[trade_log_df['Status'] == 'Win'])
-    win_ratio = (wins / total_trades) * 100 if total_trades > 0 else 0
-    avg_return = trade_log_df['Return (%)'].mean()
+    # Signal on day s+1: buy at the next day's open, sell hold_days trading days later
+    buy_px = buy_open[s]
+    sell_px = sell_open[s]
+
+    # Format all buy and sell dates in a single strftime call
+    dates = idx[np.concatenate((s + 2, s + 2 + hold_days))].strftime('%Y-%m-%d').to_numpy()
+    buy_dates, sell_dates = dates[:s.size], dates[s.size:]
+    pct = (sell_px - buy_px) / buy_px * 100
+
+    # Step 2: Analyze results directly on the return array
+    is_win = pct > 0
+    total_trades = int(s.size)
+    wins = int(np.count_nonzero(is_win))
+    sum_return = float(pct.sum())
+    win_ratio = (wins / total_trades) * 100
+    avg_return = sum_return / total_trades
+
+    # Build the trade log straight from the columnar arrays, without copying them
+    trade_log_df = pd.DataFrame({
+        'Stock': np.full(s.size, ticker, dtype=object),
+        'Buy Date': buy_dates,
+        'Buy Price': buy_px,
+        'Sell Date': sell_dates,
+        'Sell Price': sell_px,
+        'Return (%)': pct,
+        'Status': np.where(is_win, 'Win', 'Loss').astype(object)
+    }, copy=False)
     
     summary = {
         'total_trades': total_trades,
+        'wins': wins,
+        'sum_return': sum_return,
         'win_ratio': f"{win_ratio:.2f}%",
         'avg_return': f"{avg_return:.2f}%",
         'trade_log': trade_log_df
@@ -95,6 +112,7 @@ def run_backtest(stock_data: pd.DataFrame, ticker: str):
 
 if __name__ == '__main__':
     from fetch_data import fetch_stock_data
+    from indicators import calculate_indicators, make_bars
     
     print("--- Testing backtest.py ---")
     # Using a longer period to increase the chance of finding signals
@@ -102,7 +120,8 @@ if __name__ == '__main__':
     stock_data = fetch_stock_data(sample_ticker, period="2y") 
     
     if stock_data is not None:
-        backtest_results = run_backtest(stock_data, sample_ticker)
+        bars = make_bars(calculate_indicators(stock_data, sample_ticker))
+        backtest_results = run_backtest(bars, sample_ticker)
         if backtest_results:
             print(f"\nBacktest Results for {sample_ticker}:")
             print(f"  - Total Trades: {backtest_results['total_trades']}")
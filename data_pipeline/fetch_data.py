@@ -1,9 +1,61 @@
 # data_pipeline/fetch_data.py
 
+import os
+import functools
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
+# Directory where fetched OHLCV data is cached between runs
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+def _cache_path(ticker, period, source):
+    """
+    Returns the cache file path for a ticker, period and source (one file per triple).
+
+    The source ('history' or 'bulk') keeps the two download paths apart, since
+    Ticker.history and yf.download return differently shaped frames.
+    """
+    return os.path.join(CACHE_DIR, f"{ticker}_{period}_{source}.parquet")
+
+def _read_cache(ticker, period, source):
+    """Returns the cached data for a ticker, period and source, or None on a cache miss."""
+    path = _cache_path(ticker, period, source)
+    if not os.path.exists(path):
+        return None
+    # Entries are only fresh for the hour in which they were written
+    stamp = datetime.now().strftime('%Y%m%d%H')
+    if datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y%m%d%H') != stamp:
+        return None
+    try:
+        data = pd.read_parquet(path)
+        print(f"Loaded cached data for {ticker}")
+        return data
+    except Exception as e:
+        print(f"Error reading cached data for {ticker}: {e}")
+        return None
+
+def _write_cache(ticker, period, source, data):
+    """Stores fetched data for a ticker, period and source in the cache, replacing any older entry."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        data.to_parquet(_cache_path(ticker, period, source))
+    except Exception as e:
+        print(f"Error caching data for {ticker}: {e}")
+
+def _disk_cache(fetch_func):
+    """Memoizes a (ticker, period) Ticker.history fetch function on disk."""
+    @functools.wraps(fetch_func)
+    def wrapper(ticker, period="6mo"):
+        data = _read_cache(ticker, period, 'history')
+        if data is None:
+            data = fetch_func(ticker, period)
+            if data is not None:
+                _write_cache(ticker, period, 'history', data)
+        return data
+    return wrapper
+
+@_disk_cache
 def fetch_stock_data(ticker, period="6mo"):
     """
     Fetches daily historical stock data for a given ticker.
@@ -29,6 +81,82 @@ def fetch_stock_data(ticker, period="6mo"):
         print(f"Error fetching data for {ticker}: {e}")
         return None
 
+def fetch_stock_data_since(ticker, start):
+    """
+    Fetches daily stock data from a given date onwards, bypassing the cache.
+
+    yfinance usually reports a failed request as an empty DataFrame rather than an
+    exception. Callers start from a date that has a bar (the last one they saw), so
+    an empty result is treated as a failure.
+
+    Args:
+        ticker (str): The stock ticker symbol (e.g., 'RELIANCE.NS').
+        start (datetime): The first date to fetch (inclusive).
+
+    Returns:
+        pd.DataFrame: The stock data since `start`,
+                      or None if data could not be fetched.
+    """
+    try:
+        data = yf.Ticker(ticker).history(start=start.strftime('%Y-%m-%d'), auto_adjust=True)
+        if data.empty:
+            print(f"No recent data found for {ticker}.")
+            return None
+        print(f"Fetched {len(data)} recent rows for {ticker}")
+        return data
+    except Exception as e:
+        print(f"Error fetching recent data for {ticker}: {e}")
+        return None
+
+def fetch_bulk(tickers, period="6mo"):
+    """
+    Fetches daily historical stock data for several tickers in a single request.
+
+    Args:
+        tickers (list): The stock ticker symbols (e.g., ['RELIANCE.NS', 'INFY.NS']).
+        period (str): The period to fetch data for (e.g., "6mo", "1y").
+
+    Returns:
+        dict: A mapping of ticker to its historical data DataFrame. Tickers for which
+              no data could be fetched are left out.
+    """
+    # Serve what we can from the cache and only download the rest
+    stock_data = {}
+    for ticker in tickers:
+        cached = _read_cache(ticker, period, 'bulk')
+        if cached is not None:
+            stock_data[ticker] = cached
+    missing = [ticker for ticker in tickers if ticker not in stock_data]
+    if not missing:
+        return stock_data
+
+    try:
+        data = yf.download(missing, period=period, auto_adjust=True,
+                           group_by='ticker', threads=True, progress=False)
+    except Exception as e:
+        print(f"Error fetching data for {', '.join(missing)}: {e}")
+        return stock_data
+
+    if data is None or data.empty:
+        print(f"No data found for tickers {', '.join(missing)}.")
+        return stock_data
+
+    # A single ticker may come back without the ticker level in the columns
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({missing[0]: data}, axis=1)
+
+    # Split the (ticker, field) columns into one DataFrame per ticker
+    available = set(data.columns.get_level_values(0))
+    for ticker in missing:
+        ticker_data = data[ticker].dropna(how='all') if ticker in available else None
+        if ticker_data is None or ticker_data.empty:
+            print(f"No data found for ticker {ticker}. It might be delisted or an invalid ticker.")
+            continue
+        print(f"Successfully fetched data for {ticker}")
+        _write_cache(ticker, period, 'bulk', ticker_data)
+        stock_data[ticker] = ticker_data
+    return stock_data
+
 if __name__ == '__main__':
     # Example usage:
     print("--- Testing fetch_data.py ---")
@@ -1,11 +1,11 @@
 # data_pipeline/google_sheets_logger.py
 
 import os
+import functools
 import gspread
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from oauth2client.service_account import ServiceAccountCredentials
-from gspread_dataframe import set_with_dataframe
 from dotenv import load_dotenv
 
 # --- README Snippet ---
@@ -34,8 +34,9 @@ How to set up Google Sheets API access:
 # Load environment variables from .env file
 load_dotenv()
 
+@functools.lru_cache(maxsize=1)
 def _get_gspread_client():
-    """Authenticates with Google and returns a gspread client instance."""
+    """Authenticates with Google and returns a gspread client instance (cached per process)."""
     try:
         creds_path = os.getenv("GOOGLE_CREDENTIALS_PATH")
         if not creds_path or not os.path.exists(creds_path):
@@ -50,97 +51,117 @@ def _get_gspread_client():
         print(f"Error authenticating with Google Sheets: {e}")
         return None
 
-def _get_or_create_worksheet(spreadsheet, title):
-    """Gets a worksheet by title, creating it if it doesn't exist."""
-    try:
-        return spreadsheet.worksheet(title)
-    except gspread.WorksheetNotFound:
-        print(f"Worksheet '{title}' not found. Creating it.")
-        return spreadsheet.add_worksheet(title=title, rows="1000", cols="20")
-
-def log_trade_signals(signals_data: List[Dict[str, Any]]):
-    """Appends daily signal checks to the 'Trade Signals' tab."""
-    # Get the gspread client and sheet name from environment variables
-    client = _get_gspread_client()
-    sheet_name = os.getenv("GOOGLE_SHEET_NAME")
-    if not client or not sheet_name or not signals_data:
-        print("Client, sheet name, or signals data is missing. Skipping signal logging.")
-        return
-
-    try:
-        # Open the spreadsheet and the specific worksheet
-        spreadsheet = client.open(sheet_name)
-        worksheet = _get_or_create_worksheet(spreadsheet, "Trade Signals")
-        
-        # Get header row to see if we need to add it
-        header = ["Date", "Stock", "RSI", "SMA_20", "SMA_50", "Signal"]
-        if not worksheet.get_all_values(): # Check if sheet is empty
-            worksheet.append_row(header)
-
-        # Convert list of dictionaries to a list of lists for appending
-        rows_to_append = [
-            [
-                signal.get("Date"),
-                signal.get("Stock"),
-                f"{signal.get('RSI', 0):.2f}",
-                f"{signal.get('SMA_20', 0):.2f}",
-                f"{signal.get('SMA_50', 0):.2f}",
-                "Yes" if signal.get("Signal") else "No"
-            ] for signal in signals_data
-        ]
-        
-        # Append all new signal rows in a single API call
-        worksheet.append_rows(rows_to_append)
-        print(f"Successfully appended {len(rows_to_append)} rows to 'Trade Signals'.")
-
-    except gspread.exceptions.SpreadsheetNotFound:
-        print(f"Error: Spreadsheet '{sheet_name}' not found. Please create it and share it.")
-    except Exception as e:
-        print(f"An error occurred while logging trade signals: {e}")
-
-def log_backtest_results(trades_df: pd.DataFrame):
-    """Writes the full backtest trade log to the 'Backtest Log' tab."""
+@functools.lru_cache(maxsize=4)
+def _open_sheet(name):
+    """Opens a spreadsheet by name with the cached client, reusing the handle across calls."""
+    return _get_gspread_client().open(name)
+
+def reset_cache():
+    """Clears the cached gspread client and spreadsheet handles."""
+    _open_sheet.cache_clear()
+    _get_gspread_client.cache_clear()
+
+SIGNAL_HEADER = ["Date", "Stock", "RSI", "SMA_20", "SMA_50", "Signal"]
+
+def _signal_rows(signals_data: List[Dict[str, Any]]) -> List[List[Any]]:
+    """Converts signal dictionaries into rows for the 'Trade Signals' tab."""
+    return [
+        [
+            signal.get("Date"),
+            signal.get("Stock"),
+            f"{signal.get('RSI', 0):.2f}",
+            f"{signal.get('SMA_20', 0):.2f}",
+            f"{signal.get('SMA_50', 0):.2f}",
+            "Yes" if signal.get("Signal") else "No"
+        ] for signal in signals_data
+    ]
+
+def _summary_rows(stats: Dict[str, Any]) -> List[List[Any]]:
+    """Converts summary statistics into rows for the 'Summary' tab."""
+    return [
+        ["Metric", "Value"],
+        ["Total Trades", stats.get('total_trades', 'N/A')],
+        ["Win Ratio", stats.get('win_ratio', 'N/A')],
+        ["Average Return", stats.get('avg_return', 'N/A')]
+    ]
+
+def _df_to_values(df: pd.DataFrame) -> List[List[Any]]:
+    """Converts a DataFrame into a header row plus value rows, with NaN as empty cells."""
+    return [df.columns.tolist()] + df.astype(object).where(pd.notna(df), '').values.tolist()
+
+def log_all(signals_data: Optional[List[Dict[str, Any]]] = None,
+            trades_df: Optional[pd.DataFrame] = None,
+            stats: Optional[Dict[str, Any]] = None):
+    """
+    Logs signals, the backtest trade log and summary stats with batched writes.
+
+    Signals are appended below the existing rows of 'Trade Signals', while
+    'Backtest Log' and 'Summary' are overwritten. Any argument left as None is skipped.
+
+    Signals go through values.append with INSERT_ROWS, like append_rows, so the tab
+    grows as needed; the header is only added when the first row is empty. The trade
+    log is written USER_ENTERED so Sheets parses its dates and numbers, as
+    set_with_dataframe did. Signals and summary stay RAW, as with append_rows and
+    update. The overwritten ranges sharing an input option go out in one batch request.
+    """
     client = _get_gspread_client()
     sheet_name = os.getenv("GOOGLE_SHEET_NAME")
     if not client or not sheet_name:
+        print("Client or sheet name is missing. Skipping logging.")
         return
 
     try:
-        spreadsheet = client.open(sheet_name)
-        worksheet = _get_or_create_worksheet(spreadsheet, "Backtest Log")
-        worksheet.clear()  # Clear old data
-        set_with_dataframe(worksheet, trades_df)
-        print("Successfully logged backtest results to 'Backtest Log'.")
+        spreadsheet = _open_sheet(sheet_name)
+        # One metadata request for all tabs instead of one lookup per tab
+        worksheets = {worksheet.title: worksheet for worksheet in spreadsheet.worksheets()}
+
+        def worksheet_for(title):
+            if title not in worksheets:
+                print(f"Worksheet '{title}' not found. Creating it.")
+                worksheets[title] = spreadsheet.add_worksheet(title=title, rows="1000", cols="20")
+            return worksheets[title]
+
+        # Ranges grouped by value input option, one batch request per option
+        data = {'RAW': [], 'USER_ENTERED': []}
+        ranges_to_clear = []
+
+        signal_rows = []
+        if signals_data:
+            signal_rows = _signal_rows(signals_data)
+            # Only the first row is read to decide on the header, not the whole tab
+            if not worksheet_for("Trade Signals").row_values(1):
+                signal_rows = [SIGNAL_HEADER] + signal_rows
+
+        if trades_df is not None:
+            worksheet_for("Backtest Log")
+            ranges_to_clear.append("'Backtest Log'")
+            data['USER_ENTERED'].append({'range': "'Backtest Log'!A1", 'values': _df_to_values(trades_df)})
+
+        if stats:
+            worksheet_for("Summary")
+            data['RAW'].append({'range': "'Summary'!A1", 'values': _summary_rows(stats)})
+
+        if not signal_rows and not any(data.values()):
+            print("Nothing to log.")
+            return
+
+        if signal_rows:
+            spreadsheet.values_append(
+                "'Trade Signals'!A1",
+                params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+                body={'values': signal_rows}
+            )
+        if ranges_to_clear:
+            spreadsheet.values_batch_clear(body={'ranges': ranges_to_clear})
+        for value_input_option, ranges in data.items():
+            if ranges:
+                spreadsheet.values_batch_update(body={'valueInputOption': value_input_option, 'data': ranges})
+        range_count = bool(signal_rows) + sum(len(ranges) for ranges in data.values())
+        print(f"Successfully logged {range_count} range(s) to '{sheet_name}'.")
     except gspread.exceptions.SpreadsheetNotFound:
         print(f"Error: Spreadsheet '{sheet_name}' not found. Please create it and share it.")
     except Exception as e:
-        print(f"An error occurred while logging backtest results: {e}")
-
-def log_summary_stats(stats: Dict[str, Any]):
-    """Updates the 'Summary' tab with key backtest statistics."""
-    client = _get_gspread_client()
-    sheet_name = os.getenv("GOOGLE_SHEET_NAME")
-    if not client or not sheet_name:
-        return
-
-    try:
-        spreadsheet = client.open(sheet_name)
-        worksheet = _get_or_create_worksheet(spreadsheet, "Summary")
-        
-        # Prepare data for batch update
-        update_data = [
-            ["Metric", "Value"],
-            ["Total Trades", stats.get('total_trades', 'N/A')],
-            ["Win Ratio", stats.get('win_ratio', 'N/A')],
-            ["Average Return", stats.get('avg_return', 'N/A')]
-        ]
-        
-        worksheet.update('A1', update_data) # type: ignore
-        print("Successfully logged summary stats to 'Summary'.")
-    except gspread.exceptions.SpreadsheetNotFound:
-        print(f"Error: Spreadsheet '{sheet_name}' not found.")
-    except Exception as e:
-        print(f"An error occurred while logging summary stats: {e}")
+        print(f"An error occurred while logging to Google Sheets: {e}")
 
 if __name__ == '__main__':
     print("--- Testing google_sheets_logger.py ---")
@@ -157,14 +178,8 @@ if __name__ == '__main__':
         'SMA_20': 101, 'SMA_50': 100, 'Signal': True
     }]
 
-    print("\nAttempting to log dummy trade signals...")
-    log_trade_signals(dummy_signals)
+    print("\nAttempting to log dummy signals, backtest results and summary stats...")
+    log_all(signals_data=dummy_signals, trades_df=dummy_df, stats=dummy_stats)
 
-    print("\nAttempting to log dummy backtest results...")
-    log_backtest_results(dummy_df)
-    
-    print("\nAttempting to log dummy summary stats...")
-    log_summary_stats(dummy_stats)
-    
     print("\n--- Test Complete ---")
     print("Check your Google Sheet 'AlgoTrading-Log' for the new tabs and data.") 
\ No newline at end of file
@@ -0,0 +1,217 @@
+# data_pipeline/indicator_state.py
+
+import os
+import copy
+import math
+import pickle
+import pandas as pd
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from fetch_data import CACHE_DIR
+from indicators import RSI_WINDOW, SMA_SHORT_WINDOW, SMA_LONG_WINDOW
+from signal_logic import evaluate_buy_signal
+
+# A saved state older than this many calendar days is discarded and reseeded,
+# rather than catching up on a long gap from an incremental fetch.
+MAX_STATE_AGE_DAYS = 7
+
+# Relative difference between the saved and re-fetched close of the last bar that
+# counts as a price adjustment (split or dividend) rather than rounding noise.
+RESYNC_TOLERANCE = 1e-4
+
+@dataclass
+class IndicatorState:
+    """
+    Running RSI and moving-average state for one stock, updated one close at a time.
+
+    The RSI follows the same Wilder smoothing as indicators_fast.rsi: the first
+    RSI_WINDOW price changes are averaged, then each new change is blended in.
+    """
+    last_ts: Optional[Any] = None
+    last_close: Optional[float] = None
+    n_diffs: int = 0
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    sma20_window: deque = field(default_factory=lambda: deque(maxlen=SMA_SHORT_WINDOW))
+    sma50_window: deque = field(default_factory=lambda: deque(maxlen=SMA_LONG_WINDOW))
+    # Indicator values for the last two bars, used for the crossover check
+    rsi_history: deque = field(default_factory=lambda: deque(maxlen=2))
+    sma20_history: deque = field(default_factory=lambda: deque(maxlen=2))
+    sma50_history: deque = field(default_factory=lambda: deque(maxlen=2))
+
+def update_state(state: IndicatorState, ts, close: float):
+    """Feeds one new daily close into the running indicator state, in place."""
+    n = RSI_WINDOW
+    if state.last_close is not None:
+        diff = close - state.last_close
+        if state.n_diffs < n:
+            # Still collecting the first n changes for the initial averages
+            state.avg_gain += max(diff, 0.0)
+            state.avg_loss += max(-diff, 0.0)
+            state.n_diffs += 1
+            if state.n_diffs == n:
+                state.avg_gain /= n
+                state.avg_loss /= n
+        else:
+            state.avg_gain = (state.avg_gain * (n - 1) + max(diff, 0.0)) / n
+            state.avg_loss = (state.avg_loss * (n - 1) + max(-diff, 0.0)) / n
+
+    if state.n_diffs < n:
+        rsi = math.nan
+    elif state.avg_loss == 0:
+        rsi = 100.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + state.avg_gain / state.avg_loss)
+
+    state.sma20_window.append(close)
+    state.sma50_window.append(close)
+    sma20 = sum(state.sma20_window) / SMA_SHORT_WINDOW if len(state.sma20_window) == SMA_SHORT_WINDOW else math.nan
+    sma50 = sum(state.sma50_window) / SMA_LONG_WINDOW if len(state.sma50_window) == SMA_LONG_WINDOW else math.nan
+
+    state.rsi_history.append(rsi)
+    state.sma20_history.append(sma20)
+    state.sma50_history.append(sma50)
+    state.last_close = close
+    state.last_ts = ts
+
+def _trading_dates(data: pd.DataFrame):
+    """Returns the bar dates of `data` as tz-naive midnights, plus today's date in the same terms."""
+    # Compare by local trading date, since the index may or may not carry a timezone
+    tz = data.index.tz
+    dates = data.index.tz_localize(None).normalize() if tz is not None else data.index.normalize()
+    today = pd.Timestamp.now(tz=tz).tz_localize(None).normalize()
+    return dates, today
+
+def needs_resync(state: IndicatorState, data: Optional[pd.DataFrame]):
+    """
+    Checks whether the saved state no longer matches the adjusted price history.
+
+    The fetched history is split- and dividend-adjusted, so a corporate action since
+    the last update rescales the closes the state was built from. This is detected
+    from the re-fetched close of the last saved bar, or from a non-zero
+    'Stock Splits' or 'Dividends' entry on a new bar.
+
+    Args:
+        state (IndicatorState): The saved state.
+        data (pd.DataFrame): Stock data fetched from state.last_ts onwards, or None.
+
+    Returns:
+        bool: True if the state must be rebuilt from a full history.
+    """
+    if data is None or data.empty:
+        return False
+
+    dates, _ = _trading_dates(data)
+    overlap = dates == state.last_ts
+    if not overlap.any():
+        return True
+    refetched_close = float(data['Close'].to_numpy(dtype=float)[overlap][-1])
+    if not math.isclose(refetched_close, state.last_close, rel_tol=RESYNC_TOLERANCE):
+        return True
+
+    new_bars = dates > state.last_ts
+    for column in ['Stock Splits', 'Dividends']:
+        if column in data.columns and (data[column].to_numpy(dtype=float)[new_bars] != 0).any():
+            return True
+    return False
+
+def advance_state(state: IndicatorState, data: Optional[pd.DataFrame]):
+    """
+    Applies every new completed bar in `data` to the state and returns a live view.
+
+    Bars are keyed by their trading date; those at or before state.last_ts, or
+    without a close, are skipped.
+    Today's bar is still forming, so it is only applied to the returned copy: the
+    persisted state stays at the last completed bar and today's bar is re-applied
+    with its latest close on the next run.
+
+    Args:
+        state (IndicatorState): The state to advance in place.
+        data (pd.DataFrame): Recent stock data with a 'Close' column, or None.
+
+    Returns:
+        IndicatorState: The state including today's bar, for signal checks.
+    """
+    current_bar = None
+    if data is not None and not data.empty:
+        dates, today = _trading_dates(data)
+        for bar_date, close in zip(dates, data['Close'].to_numpy(dtype=float)):
+            if state.last_ts is not None and bar_date <= state.last_ts:
+                continue
+            if not math.isfinite(close):
+                # A missing close would poison every later value of the persisted state
+                continue
+            if bar_date >= today:
+                current_bar = (bar_date, float(close))
+                break
+            update_state(state, bar_date, float(close))
+
+    if current_bar is None:
+        return state
+    live_state = copy.deepcopy(state)
+    update_state(live_state, *current_bar)
+    return live_state
+
+def check_signal(state: IndicatorState, ticker):
+    """
+    Checks for a buy signal using the last two bars of the running state.
+
+    Args:
+        state (IndicatorState): The running state, including today's bar.
+        ticker (str): The stock ticker symbol, used to label the console output.
+
+    Returns:
+        tuple: (signal, rsi, sma20, sma50) like check_buy_signal, with None values
+               if the indicators are still warming up.
+    """
+    values = list(state.rsi_history) + list(state.sma20_history) + list(state.sma50_history)
+    if len(state.rsi_history) < 2 or any(math.isnan(v) for v in values):
+        print(f"Not enough data to check for a signal for {ticker}.")
+        return False, None, None, None
+
+    latest_rsi = state.rsi_history[-1]
+    latest_sma_20 = state.sma20_history[-1]
+    latest_sma_50 = state.sma50_history[-1]
+    buy_signal = evaluate_buy_signal(latest_rsi, latest_sma_20, latest_sma_50,
+                                     state.sma20_history[-2], state.sma50_history[-2], ticker)
+    return buy_signal, latest_rsi, latest_sma_20, latest_sma_50
+
+def _state_path(ticker):
+    """Returns the file path where a stock's indicator state is persisted."""
+    return os.path.join(CACHE_DIR, f"state_{ticker}.pkl")
+
+def load_state(ticker):
+    """
+    Loads the persisted indicator state for a stock.
+
+    Returns:
+        IndicatorState: The saved state, or None if there is none, it cannot be read,
+                        it holds no bars yet, or it is more than MAX_STATE_AGE_DAYS old.
+    """
+    path = _state_path(ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+    except Exception as e:
+        print(f"Error loading indicator state for {ticker}: {e}")
+        return None
+
+    if state.last_ts is None:
+        return None
+    age = pd.Timestamp.now().normalize() - pd.Timestamp(state.last_ts)
+    if age > pd.Timedelta(days=MAX_STATE_AGE_DAYS):
+        print(f"Indicator state for {ticker} is {age.days} days old. Reseeding it from full history.")
+        return None
+    return state
+
+def save_state(ticker, state: IndicatorState):
+    """Persists the indicator state for a stock."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_state_path(ticker), 'wb') as f:
+            pickle.dump(state, f)
+    except Exception as e:
+        print(f"Error saving indicator state for {ticker}: {e}")
@@ -1,14 +1,68 @@
 # data_pipeline/indicators.py
 
+import functools
+import numpy as np
 import pandas as pd
-import ta
+from dataclasses import dataclass
+from indicators_fast import rsi, sma
 
-def calculate_indicators(data):
+# Indicator windows
+RSI_WINDOW = 14
+SMA_SHORT_WINDOW = 20
+SMA_LONG_WINDOW = 50
+
+# Number of leading rows before every indicator has a value
+WARMUP = max(RSI_WINDOW, SMA_LONG_WINDOW - 1)
+
+@dataclass
+class Bars:
+    """Structure-of-arrays view of daily bars and their indicators for the signal hot path."""
+    index: pd.Index
+    open: np.ndarray
+    close: np.ndarray
+    rsi: np.ndarray
+    sma20: np.ndarray
+    sma50: np.ndarray
+
+    def __len__(self):
+        return len(self.close)
+
+@functools.lru_cache(maxsize=64)
+def _cached_indicators(ticker, close_bytes):
+    """
+    Computes RSI, 20-DMA and 50-DMA for a close series, memoized per ticker and series.
+
+    The close prices are passed as raw float64 bytes so they can serve as a cache key.
+    The returned arrays are shared between callers and therefore read-only.
+    """
+    close_np = np.frombuffer(close_bytes, dtype=np.float64)
+    indicators = (
+        rsi(close_np, window=RSI_WINDOW),
+        sma(close_np, SMA_SHORT_WINDOW),
+        sma(close_np, SMA_LONG_WINDOW),
+    )
+    for values in indicators:
+        values.setflags(write=False)
+    return indicators
+
+def _scatter(values, finite):
+    """Spreads values computed on the finite rows back to full length, NaN elsewhere."""
+    out = np.full(finite.shape[0], np.nan)
+    out[finite] = values
+    return out
+
+def calculate_indicators(data, ticker=None):
     """
     Calculates all required technical indicators (RSI, 20-DMA, 50-DMA).
 
+    Rows with a missing close are left out of the calculation, so a gap in the data
+    does not turn the following indicator values into NaN; those rows get NaN indicators.
+
     Args:
         data (pd.DataFrame): DataFrame with stock data. Must have a 'Close' column.
+        ticker (str, optional): The stock ticker symbol. When given, the indicators are
+                                memoized so repeated calls on the same series (e.g. a
+                                backtest parameter sweep) skip the computation.
 
     Returns:
         pd.DataFrame: The DataFrame with added indicator columns.
@@ -17,19 +71,69 @@ def calculate_indicators(data):
         print("Error: Input data is invalid or missing 'Close' column.")
         return None
 
-    # Using direct functional calls from 'ta' to avoid potential version compatibility issues.
-    # Calculate RSI (14-day)
-    data['RSI'] = ta.momentum.rsi(close=data['Close'], window=14) # type: ignore
+    close_np = data['Close'].to_numpy(dtype=np.float64)
+    finite = np.isfinite(close_np)
+    all_finite = finite.all()
+    if not all_finite:
+        close_np = close_np[finite]
+
+    if ticker is not None:
+        indicators = _cached_indicators(ticker, close_np.tobytes())
+        if not all_finite:
+            indicators = [_scatter(values, finite) for values in indicators]
+        data['RSI'], data['SMA_20'], data['SMA_50'] = indicators
+        return data
+
+    # Calculate RSI (14-day) with the single-pass Wilder kernel
+    rsi_values = rsi(close_np, window=RSI_WINDOW)
 
     # Calculate 20-day Moving Average
-    data['SMA_20'] = data['Close'].rolling(window=20).mean()
+    sma20_values = sma(close_np, SMA_SHORT_WINDOW)
 
     # Calculate 50-day Moving Average
-    data['SMA_50'] = data['Close'].rolling(window=50).mean()
+    sma50_values = sma(close_np, SMA_LONG_WINDOW)
+
+    if not all_finite:
+        rsi_values, sma20_values, sma50_values = (
+            _scatter(values, finite) for values in (rsi_values, sma20_values, sma50_values)
+        )
+    data['RSI'], data['SMA_20'], data['SMA_50'] = rsi_values, sma20_values, sma50_values
     
     print("Calculated RSI, 20-DMA, and 50-DMA.")
     return data
 
+def make_bars(data):
+    """
+    Converts a DataFrame with indicator columns into a Bars structure of NumPy arrays.
+
+    The first WARMUP rows, where the indicators are still NaN, are sliced off. Any
+    later row with a missing price or indicator (e.g. a gap in the data) is dropped
+    as well, so every value in the returned arrays is finite.
+
+    Args:
+        data (pd.DataFrame): Output of calculate_indicators. Must have 'Open', 'Close',
+                             'RSI', 'SMA_20' and 'SMA_50' columns.
+
+    Returns:
+        Bars: The indicator arrays, or None if the input is invalid.
+    """
+    if data is None or not all(k in data.columns for k in ['Open', 'Close', 'RSI', 'SMA_20', 'SMA_50']):
+        print("Error: DataFrame is missing required indicator columns.")
+        return None
+
+    start = WARMUP
+    index = data.index[start:]
+    columns = [data[k].to_numpy(dtype=np.float64)[start:] for k in ['Open', 'Close', 'RSI', 'SMA_20', 'SMA_50']]
+
+    # Only copy the arrays when there is actually a row to drop
+    valid = np.logical_and.reduce([np.isfinite(values) for values in columns])
+    if not valid.all():
+        index = index[valid]
+        columns = [values[valid] for values in columns]
+
+    open_, close, rsi_values, sma20, sma50 = columns
+    return Bars(index=index, open=open_, close=close, rsi=rsi_values, sma20=sma20, sma50=sma50)
+
 if __name__ == '__main__':
     # Example Usage (requires fetch_data.py to be in the same directory)
     from fetch_data import fetch_stock_data
@@ -0,0 +1,109 @@
+# data_pipeline/indicators_fast.py
+
+import numpy as np
+
+# TA-Lib is used for RSI when available; otherwise the kernel below is used.
+try:
+    import talib
+except ImportError:
+    talib = None
+
+# Numba is optional: without it the kernels below run as plain Python loops.
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True, fastmath=True)
+def _rsi_njit(close, n):
+    """
+    Computes Wilder's RSI in a single pass over the close prices.
+
+    The first average gain/loss is the simple mean of the first n price changes,
+    after which both are smoothed as avg = (avg * (n - 1) + value) / n.
+
+    Args:
+        close (np.ndarray): 1-D float64 array of close prices.
+        n (int): The RSI lookback window.
+
+    Returns:
+        np.ndarray: RSI values, NaN for the first n positions.
+    """
+    size = close.shape[0]
+    out = np.full(size, np.nan)
+    if size <= n:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n + 1):
+        diff = close[i] - close[i - 1]
+        if diff > 0:
+            avg_gain += diff
+        else:
+            avg_loss -= diff
+    avg_gain /= n
+    avg_loss /= n
+    out[n] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    for i in range(n + 1, size):
+        diff = close[i] - close[i - 1]
+        avg_gain = (avg_gain * (n - 1) + max(diff, 0.0)) / n
+        avg_loss = (avg_loss * (n - 1) + max(-diff, 0.0)) / n
+        out[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+def rsi(close, window=14):
+    """
+    Calculates the Relative Strength Index using Wilder's smoothing.
+
+    Uses TA-Lib's C implementation when installed, falling back to _rsi_njit.
+    Both seed the averages the same way, so the results match.
+
+    Args:
+        close (array-like): Close prices.
+        window (int): The RSI lookback window.
+
+    Returns:
+        np.ndarray: RSI values, NaN for the first `window` positions.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if talib is not None:
+        return talib.RSI(close, timeperiod=window)
+    return _rsi_njit(close, window)
+
+def sma(arr, n):
+    """
+    Calculates a simple moving average from a running cumulative sum.
+
+    Each window mean is the difference of two cumulative sums, so the cost per
+    point is constant regardless of the window length. As with
+    pandas rolling(n).mean(), a window containing a NaN yields NaN; the NaN
+    does not leak into later windows.
+
+    Args:
+        arr (array-like): Input values (e.g., close prices).
+        n (int): The moving average window.
+
+    Returns:
+        np.ndarray: Moving average values, NaN for the first n - 1 positions.
+    """
+    arr = np.asarray(arr, dtype=np.float64)
+    out = np.empty(arr.shape[0])
+    out[:n - 1] = np.nan
+    if arr.shape[0] < n:
+        return out
+    finite = np.isfinite(arr)
+    c = np.concatenate(([0.0], np.cumsum(np.where(finite, arr, 0.0))))
+    # Running count of valid values, to spot windows that contain a NaN
+    k = np.concatenate(([0], np.cumsum(finite)))
+    # Write the window means straight into the preallocated output
+    valid = out[n - 1:]
+    np.subtract(c[n:], c[:-n], out=valid)
+    valid /= n
+    valid[(k[n:] - k[:-n]) < n] = np.nan
+    return out
@@ -3,13 +3,98 @@
 import argparse
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # Import all necessary functions from our modules
-from fetch_data import fetch_stock_data
-from indicators import calculate_indicators
-from signal_logic import check_buy_signal
+from fetch_data import fetch_bulk, fetch_stock_data_since
+from indicators import calculate_indicators, make_bars
+from indicator_state import IndicatorState, advance_state, check_signal, load_state, needs_resync, save_state
 from backtest import run_backtest
-from google_sheets_logger import log_trade_signals, log_backtest_results, log_summary_stats
+from google_sheets_logger import log_all
+
+# Number of stocks whose live updates are fetched concurrently.
+MAX_WORKERS = 8
+
+def prepare_bars(stock_ticker, stock_data):
+    """
+    Calculates indicators for a single stock once, for the backtest and any parameter sweeps.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        stock_data (pd.DataFrame): Historical stock data, or None if fetching failed.
+
+    Returns:
+        Bars: The indicator arrays, or None if they could not be calculated.
+    """
+    if stock_data is None:
+        return None
+    data_with_indicators = calculate_indicators(stock_data, stock_ticker)
+    if data_with_indicators is None:
+        return None
+    return make_bars(data_with_indicators)
+
+def process_live_ticker(stock_ticker, state, stock_data):
+    """
+    Updates the running indicator state for a single stock and checks the latest buy signal.
+
+    Stocks with a saved state only fetch the bars added since its last update; the
+    others are seeded from the full history in `stock_data`. If a split or dividend
+    has adjusted the prices since the last update, the state is rebuilt from a fresh
+    6-month history.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        state (IndicatorState): The saved indicator state, or None on the first run.
+        stock_data (pd.DataFrame): Full historical stock data, used when there is no state.
+
+    Returns:
+        dict: The signal row to log to Google Sheets, or None if no signal could be determined.
+    """
+    if state is None:
+        if stock_data is None:
+            return None
+        state = IndicatorState()
+    else:
+        stock_data = fetch_stock_data_since(stock_ticker, state.last_ts)
+        if stock_data is None:
+            # Keep the saved state as it is and retry the update on the next run
+            return None
+        if needs_resync(state, stock_data):
+            print(f"Prices for {stock_ticker} were adjusted since the last update. Rebuilding its indicator state.")
+            stock_data = fetch_stock_data_since(stock_ticker, datetime.now() - pd.DateOffset(months=6))
+            if stock_data is None:
+                return None
+            state = IndicatorState()
+
+    live_state = advance_state(state, stock_data)
+    save_state(stock_ticker, state)
+
+    signal, rsi, sma20, sma50 = check_signal(live_state, stock_ticker)
+    if rsi is None:
+        return None
+
+    return {
+        "Date": datetime.now().strftime('%Y-%m-%d'),
+        "Stock": stock_ticker,
+        "RSI": rsi,
+        "SMA_20": sma20,
+        "SMA_50": sma50,
+        "Signal": signal
+    }
+
+def process_backtest_ticker(stock_ticker, bars):
+    """
+    Runs the strategy backtest for a single stock.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        bars (Bars): The stock's indicator arrays, or None if they are unavailable.
+
+    Returns:
+        dict: The backtest summary from run_backtest, or None if it could not be run.
+    """
+    print(f"\n----- Backtesting {stock_ticker} -----")
+    return run_backtest(bars, stock_ticker)
 
 def main():
     """
@@ -43,39 +128,31 @@ def main():
         print("--- Running in LIVE mode ---")
         live_signals_to_log = []
 
-        for stock_ticker in nifty_50_stocks:
-            print(f"\n----- Analyzing {stock_ticker} for Live Signal -----")
-            
-            # Step 1: Fetch the last 6 months of data for indicator calculation.
-            stock_data = fetch_stock_data(stock_ticker, period="6mo")
-            if stock_data is None:
-                continue
-                
-            # Step 2: Calculate technical indicators.
-            data_with_indicators = calculate_indicators(stock_data)
-            if data_with_indicators is None:
-                continue
-
-            # Step 3: Check for a buy signal based on the latest data.
-            signal, rsi, sma20, sma50 = check_buy_signal(data_with_indicators)
-
-            # Step 4: Print the summary to the console.
-            print("\n--- Live Signal Summary ---")
-            if rsi is not None:
-                print(f"  - Latest RSI: {rsi:.2f}")
-                print(f"  - 20-Day MA: {sma20:.2f}")
-                print(f"  - 50-Day MA: {sma50:.2f}")
-                print(f"  - Buy Signal Triggered: {'Yes' if signal else 'No'}")
-
-                # Prepare data for logging to Google Sheets
-                live_signals_to_log.append({
-                    "Date": datetime.now().strftime('%Y-%m-%d'),
-                    "Stock": stock_ticker,
-                    "RSI": rsi,
-                    "SMA_20": sma20,
-                    "SMA_50": sma50,
-                    "Signal": signal
-                })
+        # Step 1: Load the saved indicator state and fetch the last 6 months of data
+        # in one request for the stocks that don't have one yet.
+        states = [load_state(stock_ticker) for stock_ticker in nifty_50_stocks]
+        new_stocks = [stock_ticker for stock_ticker, state in zip(nifty_50_stocks, states) if state is None]
+        all_stock_data = fetch_bulk(new_stocks, period="6mo") if new_stocks else {}
+
+        # Steps 2-3: Update indicators and check signals for all stocks in parallel,
+        # since each stock with a saved state waits on its own network request.
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            signal_rows = list(executor.map(
+                process_live_ticker,
+                nifty_50_stocks,
+                states,
+                [all_stock_data.get(stock_ticker) for stock_ticker in nifty_50_stocks]
+            ))
+
+        # Step 4: Print the summary to the console.
+        for stock_ticker, signal_row in zip(nifty_50_stocks, signal_rows):
+            print(f"\n--- Live Signal Summary for {stock_ticker} ---")
+            if signal_row is not None:
+                print(f"  - Latest RSI: {signal_row['RSI']:.2f}")
+                print(f"  - 20-Day MA: {signal_row['SMA_20']:.2f}")
+                print(f"  - 50-Day MA: {signal_row['SMA_50']:.2f}")
+                print(f"  - Buy Signal Triggered: {'Yes' if signal_row['Signal'] else 'No'}")
+                live_signals_to_log.append(signal_row)
             else:
                 print("  - Could not determine signal due to insufficient data.")
             print("---------------------------")
@@ -83,38 +160,39 @@ def main():
         # Step 5: Log all collected signals to Google Sheets.
         if live_signals_to_log:
             print("\nLogging live signals to Google Sheets...")
-            log_trade_signals(live_signals_to_log)
+            log_all(signals_data=live_signals_to_log)
 
     elif args.mode == 'backtest':
         # --- Backtest Mode ---
         # Simulates the strategy over historical data and logs performance.
         print("--- Running in BACKTEST mode ---")
         all_trades = []
+
+        # For backtesting, a longer period like 2 years is often better to get more trades.
+        all_stock_data = fetch_bulk(nifty_50_stocks, period="2y")
         
+        # Run the backtests one stock at a time; the data is already fetched, so the
+        # work is CPU-bound, and the summaries are accumulated as running totals.
+        total_trades = 0
+        total_wins = 0
+        total_return = 0.0
         for stock_ticker in nifty_50_stocks:
-            print(f"\n----- Backtesting {stock_ticker} -----")
-            # For backtesting, a longer period like 2 years is often better to get more trades.
-            stock_data = fetch_stock_data(stock_ticker, period="2y")
-            
-            # Run the backtest function which handles its own indicator calculations.
-            results = run_backtest(stock_data, stock_ticker) # type: ignore
-            
-            if results and not results['trade_log'].empty:
+            bars = prepare_bars(stock_ticker, all_stock_data.get(stock_ticker))
+            results = process_backtest_ticker(stock_ticker, bars)
+            if results and results['total_trades'] > 0:
                 print(f"Backtest for {stock_ticker} generated {results['total_trades']} trades.")
                 all_trades.append(results['trade_log'])
+                total_trades += results['total_trades']
+                total_wins += results['wins']
+                total_return += results['sum_return']
             else:
                 print(f"No trades were generated for {stock_ticker} in the backtest.")
 
         # --- Aggregate and Log Backtest Results ---
         if all_trades:
-            # Combine all individual trade logs into one master DataFrame.
-            combined_trade_log = pd.concat(all_trades, ignore_index=True)
-            
-            # Calculate overall performance statistics.
-            total_trades = len(combined_trade_log)
-            wins = len(combined_trade_log[combined_trade_log['Status'] == 'Win'])
-            win_ratio = (wins / total_trades) * 100 if total_trades > 0 else 0
-            avg_return = combined_trade_log['Return (%)'].mean()
+            # Calculate overall performance statistics from the running totals.
+            win_ratio = (total_wins / total_trades) * 100
+            avg_return = total_return / total_trades
             
             # Prepare the summary dictionary.
             overall_summary = {
@@ -132,8 +210,9 @@ def main():
 
             # Log the detailed trade log and the final summary to Google Sheets.
             print("\nLogging backtest results to Google Sheets...")
-            log_backtest_results(combined_trade_log)
-            log_summary_stats(overall_summary)
+            # Combine all individual trade logs into one master DataFrame for logging only.
+            combined_trade_log = pd.concat(all_trades, ignore_index=True)
+            log_all(trades_df=combined_trade_log, stats=overall_summary)
         else:
             print("\nNo trades were generated across all stocks. Nothing to log.")
 
@@ -1,8 +1,8 @@
 # data_pipeline/signal_logic.py
 
-import pandas as pd
+from indicators import Bars
 
-def check_buy_signal(data):
+def check_buy_signal(bars: Bars):
     """
     Checks for a buy signal based on RSI and moving average crossover.
 
@@ -13,8 +13,7 @@ def check_buy_signal(data):
        - And 20-DMA <= 50-DMA yesterday.
 
     Args:
-        data (pd.DataFrame): DataFrame with stock data and indicator columns
-                             ('RSI', 'SMA_20', 'SMA_50').
+        bars (Bars): Indicator arrays as returned by make_bars (warm-up rows already dropped).
 
     Returns:
         tuple: A tuple containing:
@@ -23,46 +22,55 @@ def check_buy_signal(data):
             - float: The latest 20-DMA value.
             - float: The latest 50-DMA value.
     """
-    if data is None or not all(k in data.columns for k in ['RSI', 'SMA_20', 'SMA_50']):
-        print("Error: DataFrame is missing required indicator columns.")
+    if bars is None:
+        print("Error: No indicator data provided.")
         return False, None, None, None
-    
-    # Drop rows with NaN values that result from indicator calculations
-    data = data.dropna()
 
-    # Ensure there's enough data for comparison after dropping NaNs
-    if len(data) < 2:
+    # Ensure there's enough data for comparison
+    if len(bars) < 2:
         print("Not enough data to check for a signal after cleaning.")
         return False, None, None, None
 
-    # Get the last two rows of data
-    latest_data = data.iloc[-1]
-    previous_data = data.iloc[-2]
-
     # Latest indicator values
-    latest_rsi = latest_data['RSI']
-    latest_sma_20 = latest_data['SMA_20']
-    latest_sma_50 = latest_data['SMA_50']
+    latest_rsi = float(bars.rsi[-1])
+    latest_sma_20 = float(bars.sma20[-1])
+    latest_sma_50 = float(bars.sma50[-1])
+
+    buy_signal = evaluate_buy_signal(latest_rsi, latest_sma_20, latest_sma_50,
+                                     float(bars.sma20[-2]), float(bars.sma50[-2]))
 
+    return buy_signal, latest_rsi, latest_sma_20, latest_sma_50
+
+def evaluate_buy_signal(latest_rsi, latest_sma_20, latest_sma_50, previous_sma_20, previous_sma_50,
+                        ticker=None):
+    """
+    Applies the buy signal rule to today's indicator values and yesterday's moving averages.
+
+    `ticker`, if given, labels the console output, since stocks may be checked in parallel.
+
+    Returns:
+        bool: True if a buy signal is triggered, False otherwise.
+    """
     # Condition 1: RSI is below 30
     rsi_condition = latest_rsi < 30
     
     # Condition 2: 20-DMA crosses above 50-DMA
     crossover_condition = (latest_sma_20 > latest_sma_50) and \
-                          (previous_data['SMA_20'] <= previous_data['SMA_50'])
+                          (previous_sma_20 <= previous_sma_50)
 
     # Check if both conditions are met
     buy_signal = rsi_condition and crossover_condition
     
-    print(f"Checking signal: RSI<30 ({rsi_condition}), 20/50 DMA Crossover ({crossover_condition})")
+    label = f" for {ticker}" if ticker else ""
+    print(f"Checking signal{label}: RSI<30 ({rsi_condition}), 20/50 DMA Crossover ({crossover_condition})")
 
-    return buy_signal, latest_rsi, latest_sma_20, latest_sma_50
+    return buy_signal
 
 
 if __name__ == '__main__':
     # Example Usage (requires fetch_data and indicators)
     from fetch_data import fetch_stock_data
-    from indicators import calculate_indicators
+    from indicators import calculate_indicators, make_bars
 
     print("--- Testing signal_logic.py ---")
     sample_ticker = 'TCS.NS'
@@ -72,7 +80,7 @@ if __name__ == '__main__':
         stock_data_with_indicators = calculate_indicators(stock_data)
         
         if stock_data_with_indicators is not None:
-            signal, rsi, sma20, sma50 = check_buy_signal(stock_data_with_indicators)
+            signal, rsi, sma20, sma50 = check_buy_signal(make_bars(stock_data_with_indicators))
 
             print(f"\nSignal Check for {sample_ticker}:")
             if rsi is not None: